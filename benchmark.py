@@ -0,0 +1,506 @@
+"""
+Benchmark suite for DirectedGraph and UndirectedGraph
+
+Builds seeded synthetic graphs (Erdos-Renyi, power-law, grid/road-like and
+deep DAGs), times the public graph methods on them for a range of sizes and
+writes the results to a JSON file. A second mode compares two result files
+and flags operations that became slower.
+
+Usage:
+    python benchmark.py run --output results.json
+    python benchmark.py run --sizes 100 1000 --families grid --output quick.json
+    python benchmark.py compare old.json new.json --threshold 0.10
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import signal
+import sys
+import time
+
+from d_graph import DirectedGraph
+from ud_graph import UndirectedGraph
+
+
+# in-between sizes up to MATRIX_VERTEX_LIMIT give DirectedGraph a curve too
+DEFAULT_SIZES = [10 ** 2, 316, 10 ** 3, 2000, 4000, 10 ** 4, 10 ** 5, 10 ** 6]
+
+# the directed graph is an adjacency matrix, so its memory grows with V^2;
+# sizes above this limit are recorded as skipped instead of exhausting memory
+MATRIX_VERTEX_LIMIT = 4000
+
+# number of edges removed and re-added by the add_edge/remove_edge benchmark
+MUTATION_SAMPLE = 1000
+
+# maximum number of vertices in the path handed to is_valid_path
+PATH_LENGTH = 100
+
+# bounds and number of centre vertices used by the neighbourhood queries
+HOP_LIMIT = 2
+DISTANCE_LIMIT = 20
+CENTRES = 100
+
+
+# ------------------------------------------------------------------ #
+# graph generators (all return a vertex count and a list of (u, v, weight))
+
+def erdos_renyi(n, seed, avg_degree=4):
+    """
+    Return random graph with n vertices and about n * avg_degree / 2 edges
+    """
+    rng = random.Random(seed)
+    # small graphs cannot hold more edges than there are vertex pairs
+    target = min(n * avg_degree // 2, n * (n - 1) // 2)
+    seen = set()
+    edges = []
+
+    # draws random vertex pairs until enough distinct edges exist
+    while len(edges) < target:
+        u = rng.randrange(n)
+        v = rng.randrange(n)
+        if u == v or (u, v) in seen or (v, u) in seen:
+            continue
+        seen.add((u, v))
+        edges.append((u, v, rng.randint(1, 20)))
+
+    return n, edges
+
+
+def power_law(n, seed, m=2):
+    """
+    Return preferential attachment graph (Barabasi-Albert) with n vertices
+    where every new vertex is connected from m existing ones
+    """
+    rng = random.Random(seed)
+    edges = []
+
+    # every endpoint is recorded once per incident edge so that picking a
+    # random entry picks a vertex proportionally to its degree
+    targets = list(range(m))
+    for v in range(m, n):
+        chosen = set()
+        while len(chosen) < min(m, v):
+            chosen.add(rng.choice(targets))
+        # edges point from old vertices to new ones, so hubs have out-edges
+        for u in chosen:
+            edges.append((u, v, rng.randint(1, 20)))
+            targets.append(u)
+            targets.append(v)
+
+    return n, edges
+
+
+def grid(n, seed):
+    """
+    Return road-like grid graph with about n vertices, where every vertex is
+    connected to its right and lower neighbour
+    """
+    rng = random.Random(seed)
+    side = max(1, math.isqrt(n))
+    edges = []
+
+    for row in range(side):
+        for col in range(side):
+            v = row * side + col
+            if col + 1 < side:
+                edges.append((v, v + 1, rng.randint(1, 20)))
+            if row + 1 < side:
+                edges.append((v, v + side, rng.randint(1, 20)))
+
+    return side * side, edges
+
+
+def deep_dag(n, seed, extra=1):
+    """
+    Return directed acyclic graph made of a single chain through all n
+    vertices plus about n * extra random forward edges
+    """
+    rng = random.Random(seed)
+    edges = [(v, v + 1, rng.randint(1, 20)) for v in range(n - 1)]
+    seen = set((u, v) for u, v, _ in edges)
+
+    # forward edges (u < v) keep the graph acyclic
+    for _ in range(n * extra):
+        u = rng.randrange(n)
+        v = rng.randrange(n)
+        if u > v:
+            u, v = v, u
+        if v - u < 2 or (u, v) in seen:
+            continue
+        seen.add((u, v))
+        edges.append((u, v, rng.randint(1, 20)))
+
+    return n, edges
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'power_law': power_law,
+    'grid': grid,
+    'deep_dag': deep_dag,
+}
+
+
+# ------------------------------------------------------------------ #
+# workloads
+
+def adjacency(edges, n, directed):
+    """
+    Return list of neighbour lists built from the generated edges
+    """
+    adj = [[] for _ in range(n)]
+    for u, v, _ in edges:
+        adj[u].append(v)
+        if not directed:
+            adj[v].append(u)
+    return adj
+
+
+def start_vertex(adj):
+    """
+    Return vertex with the most neighbours (lowest id on ties) so that
+    traversals start where they can reach a large part of the graph
+    """
+    return max(range(len(adj)), key=lambda v: (len(adj[v]), -v), default=0)
+
+
+def random_walk(adj, seed, length=PATH_LENGTH, attempts=20):
+    """
+    Return path of at most length vertices that follows existing edges
+    Steps avoid sinks where possible, and a walk that still reaches one is
+    restarted from another vertex keeping the longest walk, so only
+    acyclic graphs may give shorter paths
+    """
+    rng = random.Random(seed)
+    candidates = [v for v in range(len(adj)) if adj[v]]
+    if not candidates:
+        return [0]
+
+    best = []
+    for _ in range(attempts):
+        path = [rng.choice(candidates)]
+        while len(path) < length and adj[path[-1]]:
+            onward = [v for v in adj[path[-1]] if adj[v]]
+            path.append(rng.choice(onward or adj[path[-1]]))
+        if len(path) > len(best):
+            best = path
+        if len(best) == length:
+            break
+    return best
+
+
+def directed_ops(n, edges, seed):
+    """
+    Return (name, setup, func) triples benchmarked on DirectedGraph
+    """
+    rng = random.Random(seed)
+    sample = rng.sample(edges, min(MUTATION_SAMPLE, len(edges)))
+    adj = adjacency(edges, n, directed=True)
+    path = random_walk(adj, seed)
+    start = start_vertex(adj)
+    centres = [rng.randrange(n) for _ in range(CENTRES)]
+
+    def construct():
+        return DirectedGraph(edges)
+
+    def mutate(g):
+        for u, v, _ in sample:
+            g.remove_edge(u, v)
+        for u, v, w in sample:
+            g.add_edge(u, v, w)
+
+    # same command stream as mutate, applied as one batch
+    batch = ([('remove', u, v) for u, v, _ in sample] +
+             [('add', u, v, w) for u, v, w in sample])
+
+    return [
+        ('construct', None, construct),
+        ('add_remove_edge', construct, mutate),
+        ('apply_mutations', construct, lambda g: g.apply_mutations(batch)),
+        ('dfs', construct, lambda g: g.dfs(start)),
+        ('bfs', construct, lambda g: g.bfs(start)),
+        ('dijkstra', construct, lambda g: g.dijkstra(start)),
+        ('neighborhood', construct, lambda g: g.neighborhood(start, HOP_LIMIT)),
+        ('neighborhoods', construct, lambda g: g.neighborhoods(centres, HOP_LIMIT)),
+        ('within_distance', construct,
+         lambda g: g.within_distance(start, DISTANCE_LIMIT)),
+        ('within_distances', construct,
+         lambda g: g.within_distances(centres, DISTANCE_LIMIT)),
+        ('has_cycle', construct, lambda g: g.has_cycle()),
+        ('is_valid_path', construct, lambda g: g.is_valid_path(path)),
+    ]
+
+
+def undirected_ops(n, edges, seed):
+    """
+    Return (name, setup, func) triples benchmarked on UndirectedGraph
+    """
+    rng = random.Random(seed)
+    pairs = [(str(u), str(v)) for u, v, _ in edges]
+    sample = rng.sample(pairs, min(MUTATION_SAMPLE, len(pairs)))
+    adj = adjacency(edges, n, directed=False)
+    path = [str(v) for v in random_walk(adj, seed)]
+    start = str(start_vertex(adj))
+    centres = [str(rng.randrange(n)) for _ in range(CENTRES)]
+
+    def construct():
+        return UndirectedGraph(pairs)
+
+    def mutate(g):
+        for u, v in sample:
+            g.remove_edge(u, v)
+        for u, v in sample:
+            g.add_edge(u, v)
+
+    # same command stream as mutate, applied as one batch
+    batch = ([('remove', u, v) for u, v in sample] +
+             [('add', u, v) for u, v in sample])
+
+    return [
+        ('construct', None, construct),
+        ('add_remove_edge', construct, mutate),
+        ('apply_mutations', construct, lambda g: g.apply_mutations(batch)),
+        ('dfs', construct, lambda g: g.dfs(start)),
+        ('bfs', construct, lambda g: g.bfs(start)),
+        ('neighborhood', construct, lambda g: g.neighborhood(start, HOP_LIMIT)),
+        ('neighborhoods', construct, lambda g: g.neighborhoods(centres, HOP_LIMIT)),
+        ('has_cycle', construct, lambda g: g.has_cycle()),
+        ('count_connected_components', construct,
+         lambda g: g.count_connected_components()),
+        ('is_valid_path', construct, lambda g: g.is_valid_path(path)),
+    ]
+
+
+GRAPH_CLASSES = {
+    'DirectedGraph': directed_ops,
+    'UndirectedGraph': undirected_ops,
+}
+
+
+# ------------------------------------------------------------------ #
+# runner
+
+class BenchmarkTimeout(Exception):
+    """
+    Raised when a single benchmarked call runs longer than allowed
+    """
+
+
+def _on_alarm(signum, frame):
+    raise BenchmarkTimeout()
+
+
+def time_op(setup, func, repeat, timeout):
+    """
+    Return best wall clock time in seconds of func over repeat runs
+    The graph built by setup is shared between runs, so func must leave it
+    in the state it found it
+    Each call is interrupted with BenchmarkTimeout after timeout seconds
+    on platforms that provide SIGALRM
+    """
+    use_alarm = hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+
+    try:
+        arg = setup() if setup is not None else None
+        best = float('inf')
+        for _ in range(repeat):
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            start = time.perf_counter()
+            func(arg) if setup is not None else func()
+            best = min(best, time.perf_counter() - start)
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return best
+
+
+def run(sizes, families, classes, repeat, budget, seed, log=sys.stderr):
+    """
+    Return list of result records for every class / family / size / operation
+    An operation that takes longer than budget seconds is not run again
+    for larger sizes of the same class and family, and a single call is
+    abandoned after budget * 5 seconds
+    """
+    results = []
+
+    for class_name in classes:
+        for family in families:
+            # operations that exceeded the time budget at a smaller size
+            over_budget = set()
+
+            for size in sizes:
+                n, edges = GENERATORS[family](size, seed)
+                base = {
+                    'graph': class_name,
+                    'family': family,
+                    'vertices': n,
+                    'edges': len(edges),
+                }
+
+                for op, setup, func in GRAPH_CLASSES[class_name](n, edges, seed):
+                    record = dict(base, op=op, seconds=None, status='ok', note='')
+
+                    if class_name == 'DirectedGraph' and n > MATRIX_VERTEX_LIMIT:
+                        record['status'] = 'skipped'
+                        record['note'] = (f'adjacency matrix limited to '
+                                          f'{MATRIX_VERTEX_LIMIT} vertices')
+                    elif op in over_budget or 'construct' in over_budget:
+                        record['status'] = 'skipped'
+                        record['note'] = f'exceeded {budget}s budget at a smaller size'
+                    else:
+                        try:
+                            record['seconds'] = time_op(setup, func, repeat, budget * 5)
+                        except BenchmarkTimeout:
+                            record['status'] = 'timeout'
+                            record['note'] = f'interrupted after {budget * 5}s'
+                            over_budget.add(op)
+                        except RecursionError:
+                            record['status'] = 'error'
+                            record['note'] = 'recursion limit exceeded'
+                            over_budget.add(op)
+                        else:
+                            if record['seconds'] > budget:
+                                over_budget.add(op)
+
+                    results.append(record)
+                    print(format_record(record), file=log)
+
+    return results
+
+
+def format_record(record):
+    """
+    Return one line summary of a result record
+    """
+    return '{:<16} {:<12} {:>8} {:<27} {} {}'.format(
+        record['graph'], record['family'], record['vertices'],
+        record['op'], format_timing(record), record['note']).rstrip()
+
+
+# ------------------------------------------------------------------ #
+# comparison
+
+def compare(old, new, threshold):
+    """
+    Return list of (key, old_record, new_record, ratio) for operations found
+    in both runs, list of keys that regressed and list of (key, run) for keys
+    found only in the 'old' or the 'new' run
+    A key regresses if it became slower by more than threshold (0.10 means
+    10% slower) or if it was timed in the old run but not in the new one;
+    ratio is None unless both runs timed the operation
+    """
+    def index(results):
+        return {(r['graph'], r['family'], r['vertices'], r['op']): r
+                for r in results}
+
+    old_records = index(old['results'])
+    new_records = index(new['results'])
+    rows = []
+    regressions = []
+
+    for key in sorted(old_records.keys() & new_records.keys()):
+        before = old_records[key]
+        after = new_records[key]
+        ratio = None
+
+        if before['seconds'] is not None and after['seconds'] is not None:
+            if before['seconds'] > 0:
+                ratio = after['seconds'] / before['seconds']
+            else:
+                ratio = float('inf')
+            if ratio > 1 + threshold:
+                regressions.append(key)
+        elif before['status'] == 'ok' and after['status'] != 'ok':
+            # an operation that no longer completes is the worst regression
+            regressions.append(key)
+
+        rows.append((key, before, after, ratio))
+
+    unmatched = [(key, 'old') for key in sorted(old_records.keys() - new_records.keys())]
+    unmatched += [(key, 'new') for key in sorted(new_records.keys() - old_records.keys())]
+
+    return rows, regressions, unmatched
+
+
+def format_timing(record):
+    """
+    Return seconds of a result record, or its status if it was not timed
+    """
+    if record['seconds'] is None:
+        return record['status']
+    return '{:.6f}s'.format(record['seconds'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='run benchmarks and write results')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run_parser.add_argument('--families', nargs='+', choices=sorted(GENERATORS),
+                            default=list(GENERATORS))
+    run_parser.add_argument('--classes', nargs='+', choices=sorted(GRAPH_CLASSES),
+                            default=list(GRAPH_CLASSES))
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--budget', type=float, default=10.0,
+                            help='seconds per operation before larger sizes are skipped')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', default='bench_output.json')
+
+    cmp_parser = sub.add_parser('compare', help='compare two result files')
+    cmp_parser.add_argument('old')
+    cmp_parser.add_argument('new')
+    cmp_parser.add_argument('--threshold', type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        # deep recursion in has_cycle is part of what is being measured
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+        results = run(sorted(args.sizes), args.families, args.classes,
+                      args.repeat, args.budget, args.seed)
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'budget': args.budget,
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'wrote {len(results)} results to {args.output}')
+        return 0
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows, regressions, unmatched = compare(old, new, args.threshold)
+    for key, before, after, ratio in rows:
+        flag = 'REGRESSION' if key in regressions else ''
+        change = '' if ratio is None else 'x{:.2f}'.format(ratio)
+        print('{:<16} {:<12} {:>8} {:<27} {} -> {}  {} {}'.format(
+            *key, format_timing(before), format_timing(after), change, flag).rstrip())
+    for key, run_name in unmatched:
+        print('{:<16} {:<12} {:>8} {:<27} only in {} run'.format(*key, run_name))
+    print(f'{len(regressions)} regression(s) above {args.threshold:.0%}, '
+          f'{len(unmatched)} operation(s) found in only one run')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,7 @@
+import heapq
+from collections import deque
+
+
 class DirectedGraph:
     """
     Class to implement directed weighted graph
@@ -5,8 +9,14 @@ class DirectedGraph:
     - loops not allowed
     - only positive edge weights
     - vertex names are integers
+    - removed vertices stay in the matrix as tombstones until compact()
     """
 
+    # ids of removed vertices and the order in which they are reused;
+    # replaced by containers owned by the graph on the first remove_vertex()
+    removed = frozenset()
+    free_list = ()
+
     def __init__(self, start_edges=None):
         """
         Store graph info as adjacency matrix
@@ -49,7 +59,24 @@ class DirectedGraph:
         """
         Adds vertex to the graph and returns the number
         of vertices in the graph after the addition
+        The id of the new vertex is not returned since a removed id may be
+        reused, use new_vertex() when the id is needed
+        """
+        self.new_vertex()
+        return self.v_count - len(self.removed)
+
+    def new_vertex(self) -> int:
         """
+        Adds vertex to the graph and returns its id
+        The most recently removed vertex id is reused if there is one,
+        otherwise the id is the next row of the matrix
+        """
+        # reuses a tombstone, whose row and column were cleared on removal
+        if self.free_list:
+            v = self.free_list.pop()
+            self.removed.discard(v)
+            return v
+
         # increments vertex count and adds new row to matrix which represents the vertex
         self.v_count += 1
         self.adj_matrix.append(self.v_count * [0])
@@ -58,7 +85,7 @@ class DirectedGraph:
         for i in range(self.v_count - 1):
             self.adj_matrix[i].append(0)
 
-        return self.v_count
+        return self.v_count - 1
 
     def add_edge(self, src: int, dst: int, weight=1) -> None:
         """
@@ -67,6 +94,8 @@ class DirectedGraph:
         # returns if any of the following error conditions are triggered
         if src >= self.v_count or dst >= self.v_count or weight <= 0 or src == dst:
             return
+        if src in self.removed or dst in self.removed:
+            return
 
         # adds edge
         self.adj_matrix[src][dst] = weight
@@ -79,13 +108,97 @@ class DirectedGraph:
         if 0 <= src < self.v_count and 0 <= dst < self.v_count:
             self.adj_matrix[src][dst] = 0
 
+    def apply_mutations(self, mutations) -> bool:
+        """
+        Applies batch of ('add', src, dst[, weight]) and ('remove', src, dst)
+        commands as a single change and returns True
+        Removes of missing edges or vertices are ignored as in remove_edge()
+        If any command is invalid, nothing is applied and False is returned
+        """
+        matrix = self.adj_matrix
+        v_count = self.v_count
+        removed = self.removed
+
+        # validated (src, dst, weight) writes, 0 weight for a removed edge
+        # a matrix cell keeps only its last write, so add/remove pairs on
+        # the same edge collapse to their final state without extra work
+        writes = []
+
+        for mutation in mutations:
+            if len(mutation) == 3:
+                command, src, dst = mutation
+                weight = 1
+            else:
+                command, src, dst, weight = mutation
+
+            # whole batch is rejected if any of its commands is invalid
+            if type(src) is not int or type(dst) is not int:
+                return False
+            if command == 'add':
+                if not (0 <= src < v_count and 0 <= dst < v_count) or weight <= 0 \
+                        or src == dst or src in removed or dst in removed:
+                    return False
+                writes.append((src, dst, weight))
+            elif command == 'remove':
+                if 0 <= src < v_count and 0 <= dst < v_count:
+                    writes.append((src, dst, 0))
+            else:
+                return False
+
+        for src, dst, weight in writes:
+            matrix[src][dst] = weight
+
+        return True
+
+    def remove_vertex(self, v: int) -> None:
+        """
+        Removes vertex and all connected edges
+        The id is kept as a tombstone and reused by new_vertex() / add_vertex()
+        """
+        if not 0 <= v < self.v_count or v in self.removed:
+            return
+
+        # replaces the shared class defaults on the first removal
+        if not self.removed:
+            self.removed = set()
+            self.free_list = []
+
+        # clears the vertex row and column instead of rebuilding the matrix
+        self.adj_matrix[v] = self.v_count * [0]
+        for i in range(self.v_count):
+            self.adj_matrix[i][v] = 0
+
+        self.removed.add(v)
+        self.free_list.append(v)
+
+    def compact(self, threshold=0.0):
+        """
+        Drops tombstoned vertices from the matrix if they make up more than
+        threshold of its rows, and returns dict mapping old to new vertex ids
+        The mapping is the identity if the graph was not compacted
+        """
+        if not self.removed or len(self.removed) <= threshold * self.v_count:
+            return {v: v for v in self.get_vertices()}
+
+        # remaining vertices keep their relative order
+        kept = [i for i in range(self.v_count) if i not in self.removed]
+        mapping = {old: new for new, old in enumerate(kept)}
+
+        self.adj_matrix = [[self.adj_matrix[i][j] for j in kept] for i in kept]
+        self.v_count = len(kept)
+        self.removed = set()
+        self.free_list = []
+
+        return mapping
+
     def get_vertices(self) -> []:
         """
         Returns a list of the graph's vertices
         """
         vert_list = []
         for i in range(self.v_count):
-            vert_list.append(i)
+            if i not in self.removed:
+                vert_list.append(i)
 
         return vert_list
 
@@ -112,6 +225,11 @@ class DirectedGraph:
         if not path:
             return True
 
+        # path is invalid if it passes through a removed vertex
+        for vertex in path:
+            if vertex in self.removed:
+                return False
+
         # path is invalid if any vertex in the path does not exist
         for i in range(len(path) - 1):
             if self.adj_matrix[path[i]][path[i + 1]] == 0:
@@ -125,7 +243,7 @@ class DirectedGraph:
         Vertex indices are prioritized by ascending order when multiple
         options are available for the next vertex in the search (e.g., 0 before 1)
         """
-        if v_start < 0 or v_start >= self.v_count:
+        if v_start < 0 or v_start >= self.v_count or v_start in self.removed:
             return []
 
         # initializes lists used in dfs
@@ -162,7 +280,7 @@ class DirectedGraph:
         options are available for the next vertex in the search (e.g., 0 before 1)
         """
 
-        if v_start < 0 or v_start >= self.v_count:
+        if v_start < 0 or v_start >= self.v_count or v_start in self.removed:
             return []
 
         # initializes lists used in bfs
@@ -233,12 +351,18 @@ class DirectedGraph:
         to all other vertices in the graph
         """
         distance = self.v_count * [float('inf')]
+        if src in self.removed:
+            return distance
         distance[src] = 0
+
+        # removed vertices are never selected and stay at infinite distance
         visited = self.v_count * [False]
+        for v in self.removed:
+            visited[v] = True
 
         # finds index of visited vertex with smallest distance
         # and changes its value in the visited list to True
-        for i in range(self.v_count):
+        for i in range(self.v_count - len(self.removed)):
             min_i = self.get_min_index(distance, visited)
             visited[min_i] = True
 
@@ -266,6 +390,102 @@ class DirectedGraph:
 
         return min_index
 
+    def neighborhood(self, v: int, k: int) -> dict:
+        """
+        Returns dict mapping every vertex reachable from v in at most
+        k edges to its hop count, in the order the vertices are reached
+        """
+        return self.bounded_bfs(v, k, dict())
+
+    def neighborhoods(self, vertices, k: int) -> dict:
+        """
+        Returns dict mapping each vertex in vertices to its neighborhood(v, k)
+        Matrix rows are scanned once and repeated centres are searched once
+        for the whole batch
+        """
+        out_edges = dict()
+        result = dict()
+        for v in vertices:
+            if v not in result:
+                result[v] = self.bounded_bfs(v, k, out_edges)
+        return result
+
+    def within_distance(self, v: int, d) -> dict:
+        """
+        Returns dict mapping every vertex whose shortest path from v
+        is at most d to that distance, in ascending order of distance
+        """
+        return self.bounded_dijkstra(v, d, dict())
+
+    def within_distances(self, vertices, d) -> dict:
+        """
+        Returns dict mapping each vertex in vertices to its within_distance(v, d)
+        Matrix rows are scanned once and repeated centres are searched once
+        for the whole batch
+        """
+        out_edges = dict()
+        result = dict()
+        for v in vertices:
+            if v not in result:
+                result[v] = self.bounded_dijkstra(v, d, out_edges)
+        return result
+
+    def get_out_edges(self, v, out_edges):
+        """
+        Returns list of (vertex, weight) for the edges leaving v
+        Rows are cached in out_edges so repeated lookups do not rescan the matrix
+        """
+        if v not in out_edges:
+            out_edges[v] = [(i, w) for i, w in enumerate(self.adj_matrix[v])
+                            if w > 0]
+        return out_edges[v]
+
+    def bounded_bfs(self, v_start, k, out_edges):
+        """
+        Helper method for neighborhood and neighborhoods
+        """
+        if v_start < 0 or v_start >= self.v_count or v_start in self.removed or k < 0:
+            return dict()
+
+        hops = {v_start: 0}
+        queue = deque([v_start])
+
+        # vertices whose neighbours would be past the bound are not expanded
+        while queue:
+            vertex = queue.popleft()
+            if hops[vertex] + 1 > k:
+                continue
+            for i, _ in self.get_out_edges(vertex, out_edges):
+                if i not in hops:
+                    hops[i] = hops[vertex] + 1
+                    queue.append(i)
+
+        return hops
+
+    def bounded_dijkstra(self, src, d, out_edges):
+        """
+        Helper method for within_distance and within_distances
+        """
+        if src < 0 or src >= self.v_count or src in self.removed or d < 0:
+            return dict()
+
+        distance = dict()
+        heap = [(0, src)]
+
+        # search stops at the first vertex that is farther than d
+        while heap:
+            dist, vertex = heapq.heappop(heap)
+            if vertex in distance:
+                continue
+            if dist > d:
+                break
+            distance[vertex] = dist
+            for i, weight in self.get_out_edges(vertex, out_edges):
+                if i not in distance and dist + weight <= d:
+                    heapq.heappush(heap, (dist + weight, i))
+
+        return distance
+
 
 if __name__ == '__main__':
 
@@ -337,3 +557,55 @@ if __name__ == '__main__':
     print('\n', g)
     for i in range(5):
         print(f'DIJKSTRA {i} {g.dijkstra(i)}')
+
+    print("\nmethod apply_mutations() example 1")
+    print("---------------------------------")
+    edges = [(0, 1, 10), (4, 0, 12), (1, 4, 15), (4, 3, 3),
+             (3, 1, 5), (2, 1, 23), (3, 2, 7)]
+    g = DirectedGraph(edges)
+    # adds on a missing vertex, bad weights or non-integer ids reject the batch
+    print(g.apply_mutations([('remove', 0, 1), ('add', 0, 5)]), g.get_edges())
+    print(g.apply_mutations([('remove', 0, 1), ('add', 0, 2, -1)]), g.get_edges())
+    print(g.apply_mutations([('remove', 0, 1), ('add', 1.0, 2, 5)]), g.get_edges())
+    # removes on a missing vertex are ignored like remove_edge()
+    print(g.apply_mutations([('remove', 0, 9), ('remove', 4, 0)]), g.get_edges())
+    g.add_edge(4, 0, 12)
+    # add/remove pairs cancel out, the last weight written for an edge wins
+    mutations = [('add', 0, 2, 4), ('remove', 0, 2), ('remove', 0, 1),
+                 ('add', 0, 1, 8), ('add', 1, 2), ('add', 1, 2, 6), ('remove', 3, 2)]
+    print(g.apply_mutations(mutations), g.get_edges())
+
+    print("\nmethod remove_vertex() / new_vertex() / compact() example 1")
+    print("-----------------------------------------------------------")
+    edges = [(0, 1, 10), (4, 0, 12), (1, 4, 15), (4, 3, 3),
+             (3, 1, 5), (2, 1, 23), (3, 2, 7)]
+    g = DirectedGraph(edges)
+    g.remove_vertex(1)
+    print(g.get_vertices(), g.get_edges())
+    # removed vertex is skipped by searches, rejects edges and stays unreachable
+    g.add_edge(0, 1, 4)
+    print(g.dfs(1), g.bfs(1), g.dfs(4), g.bfs(4))
+    print(g.is_valid_path([1]), g.is_valid_path([4, 3, 2]), g.is_valid_path([3, 1]))
+    for i in range(5):
+        print(f'DIJKSTRA {i} {g.dijkstra(i)}')
+    # removed ids are reused, most recently removed first
+    g.remove_vertex(0)
+    print(g.new_vertex(), g.add_vertex(), g.new_vertex(), g.get_vertices())
+    g.add_edge(0, 1, 4)
+    print(g.get_edges())
+    # compact renumbers the remaining vertices and returns the mapping
+    g = DirectedGraph(edges)
+    g.remove_vertex(0)
+    g.remove_vertex(2)
+    print(g.compact(0.5), g.compact(0.3))
+    print(g.get_edges(), g.dijkstra(0))
+
+    print("\nmethod neighborhood() / within_distance() example 1")
+    print("--------------------------------------------------")
+    edges = [(0, 1, 10), (4, 0, 12), (1, 4, 15), (4, 3, 3),
+             (3, 1, 5), (2, 1, 23), (3, 2, 7)]
+    g = DirectedGraph(edges)
+    for k in (0, 1, 2):
+        print(f'4 {k} {g.neighborhood(4, k)}')
+    print(g.within_distance(4, 10), g.within_distance(4, float('inf')), g.dijkstra(4))
+    print(g.neighborhoods([3, 4, 3], float('inf')), g.within_distances([3, 4, 4], 8))
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class UndirectedGraph:
     """
     Class to implement undirected graph
@@ -97,6 +100,59 @@ class UndirectedGraph:
             # deletes v
             del self.adj_list[v]
 
+    def apply_mutations(self, mutations) -> bool:
+        """
+        Apply batch of ('add', u, v) and ('remove', u, v) commands
+        as a single change and return True
+        Removes of missing edges or vertices are ignored as in remove_edge()
+        If any command is invalid, nothing is applied and False is returned
+        """
+        # net result of the batch for every edge touched by it
+        # (True for an added edge, False for a removed one)
+        net = dict()
+        # kept in command order so vertices are added as add_edge would
+        new_vertices = dict()
+
+        for command, u, v in mutations:
+            # whole batch is rejected if any of its commands is invalid
+            if command == 'add':
+                if u == v:
+                    return False
+                # add_edge creates its vertices even if the edge is later removed
+                new_vertices[u] = None
+                new_vertices[v] = None
+            elif command != 'remove':
+                return False
+            if u != v:
+                net[(u, v) if u < v else (v, u)] = command == 'add'
+
+        for vertex in new_vertices:
+            self.add_vertex(vertex)
+
+        # compares the net state of every edge with the graph, scanning the
+        # shorter of the two lists, so edges that do not change are skipped
+        to_remove = dict()
+        for (u, v), present in net.items():
+            if u not in self.adj_list or v not in self.adj_list:
+                continue
+            if len(self.adj_list[u]) > len(self.adj_list[v]):
+                u, v = v, u
+            if (v in self.adj_list[u]) == present:
+                continue
+            if present:
+                self.adj_list[u].append(v)
+                self.adj_list[v].append(u)
+            else:
+                to_remove.setdefault(u, set()).add(v)
+                to_remove.setdefault(v, set()).add(u)
+
+        # lists that lose edges are rebuilt once, all others are left alone
+        for vertex, removed in to_remove.items():
+            self.adj_list[vertex] = [item for item in self.adj_list[vertex]
+                                     if item not in removed]
+
+        return True
+
     def get_vertices(self) -> []:
         """
         Return list of vertices in the graph (any order)
@@ -264,6 +320,54 @@ class UndirectedGraph:
                 return True
         return False
 
+    def neighborhood(self, v: str, k: int) -> dict:
+        """
+        Return dict mapping every vertex at most k edges away from v
+        to its hop count, in the order the vertices are reached
+        """
+        if v not in self.adj_list or k < 0:
+            return dict()
+
+        hops = {v: 0}
+        queue = deque([v])
+
+        # vertices whose neighbours would be past the bound are not expanded
+        while queue:
+            vertex = queue.popleft()
+            if hops[vertex] + 1 > k:
+                continue
+            for item in self.adj_list[vertex]:
+                if item not in hops:
+                    hops[item] = hops[vertex] + 1
+                    queue.append(item)
+
+        return hops
+
+    def neighborhoods(self, vertices, k: int) -> dict:
+        """
+        Return dict mapping each vertex in vertices to its neighborhood(v, k)
+        Adjacency lists need no preparation, so the only work shared across
+        the batch is that repeated centres are searched once
+        """
+        result = dict()
+        for v in vertices:
+            if v not in result:
+                result[v] = self.neighborhood(v, k)
+        return result
+
+    def within_distance(self, v: str, d) -> dict:
+        """
+        Return dict mapping every vertex whose shortest path from v
+        is at most d to that distance (every edge has length 1)
+        """
+        return self.neighborhood(v, d)
+
+    def within_distances(self, vertices, d) -> dict:
+        """
+        Return dict mapping each vertex in vertices to its within_distance(v, d)
+        """
+        return self.neighborhoods(vertices, d)
+
 
 if __name__ == '__main__':
 
@@ -351,6 +455,25 @@ if __name__ == '__main__':
         g.add_edge(u, v) if command == 'add' else g.remove_edge(u, v)
         print('{:<10}'.format(case), g.has_cycle())
 
+    print("\nmethod apply_mutations() example 1")
+    print("---------------------------------")
+    g = UndirectedGraph(['AB', 'AC', 'BC'])
+    # invalid command (loop) rejects the whole batch
+    print(g.apply_mutations([('remove', 'A', 'B'), ('add', 'D', 'D')]), g)
+    # add/remove pairs cancel out, adds on absent vertices create them
+    mutations = [('add', 'A', 'D'), ('remove', 'D', 'A'), ('remove', 'A', 'B'),
+                 ('add', 'B', 'A'), ('remove', 'B', 'C'), ('add', 'E', 'F')]
+    print(g.apply_mutations(mutations), g)
+
+    print("\nmethod neighborhood() / within_distance() example 1")
+    print("--------------------------------------------------")
+    edges = ['AE', 'AC', 'BE', 'CE', 'CD', 'CB', 'BD', 'ED', 'BH', 'QG', 'FG']
+    g = UndirectedGraph(edges)
+    for k in (0, 1, 2):
+        print(f'A {k} {g.neighborhood("A", k)}')
+    print(g.within_distance('H', 1.5), g.within_distance('H', float('inf')))
+    print(g.neighborhoods(['A', 'G', 'A'], 1))
+
     """
     Class to implement undirected graph
     - duplicate edges not allowed